@@ -0,0 +1,37 @@
+"""create pdfs table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Databases that predate migrations already have this table from the
+    # app's create_all; adopt it as the baseline instead of failing. Offline
+    # (--sql) runs have no database to inspect and emit the full DDL
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+    if inspector is None or not inspector.has_table("pdfs"):
+        op.create_table(
+            "pdfs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("filename", sa.String(255), nullable=False),
+            sa.Column("s3_key", sa.String(500), nullable=False),
+            sa.Column("file_size", sa.Integer()),
+            sa.Column("upload_date", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("status", sa.Enum("PENDING", "UPLOADED", "INDEXED", name="pdfstatus")),
+            sa.Column("vector_index_id", sa.String(255), nullable=True),
+            sa.Column("content_summary", sa.Text(), nullable=True),
+        )
+    if inspector is None or "ix_pdfs_id" not in {index["name"] for index in inspector.get_indexes("pdfs")}:
+        op.create_index("ix_pdfs_id", "pdfs", ["id"])
+
+def downgrade():
+    op.drop_index("ix_pdfs_id", table_name="pdfs")
+    op.drop_table("pdfs")
@@ -0,0 +1,18 @@
+"""unique index on pdfs.filename
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index("ix_pdfs_filename", "pdfs", ["filename"], unique=True)
+
+def downgrade():
+    op.drop_index("ix_pdfs_filename", table_name="pdfs")
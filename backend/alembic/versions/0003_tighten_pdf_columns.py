@@ -0,0 +1,36 @@
+"""tighten pdfs column widths and add listing index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.alter_column(
+        "pdfs", "vector_index_id",
+        existing_type=sa.String(255),
+        type_=sa.String(64),
+        existing_nullable=True
+    )
+    op.create_index("ix_pdfs_s3_key", "pdfs", ["s3_key"], unique=True)
+    op.create_index(
+        "ix_pdfs_status_upload_date", "pdfs",
+        ["status", sa.text("upload_date DESC")]
+    )
+
+def downgrade():
+    op.drop_index("ix_pdfs_status_upload_date", table_name="pdfs")
+    op.drop_index("ix_pdfs_s3_key", table_name="pdfs")
+    op.alter_column(
+        "pdfs", "vector_index_id",
+        existing_type=sa.String(64),
+        type_=sa.String(255),
+        existing_nullable=True
+    )
@@ -0,0 +1,31 @@
+"""track last modification time of pdfs rows
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.mysql import DATETIME
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column(
+        "pdfs",
+        sa.Column(
+            "updated_at",
+            DATETIME(fsp=6),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)")
+        )
+    )
+    # Lets the listing ETag read MAX(updated_at) from the index
+    op.create_index("ix_pdfs_updated_at", "pdfs", ["updated_at"])
+
+def downgrade():
+    op.drop_index("ix_pdfs_updated_at", table_name="pdfs")
+    op.drop_column("pdfs", "updated_at")
@@ -0,0 +1,30 @@
+"""add PROCESSING to pdf status
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-15 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.alter_column(
+        "pdfs", "status",
+        existing_type=sa.Enum("PENDING", "UPLOADED", "INDEXED", name="pdfstatus"),
+        type_=sa.Enum("PENDING", "UPLOADED", "PROCESSING", "INDEXED", name="pdfstatus"),
+        existing_nullable=True
+    )
+
+def downgrade():
+    op.execute("UPDATE pdfs SET status = 'UPLOADED' WHERE status = 'PROCESSING'")
+    op.alter_column(
+        "pdfs", "status",
+        existing_type=sa.Enum("PENDING", "UPLOADED", "PROCESSING", "INDEXED", name="pdfstatus"),
+        type_=sa.Enum("PENDING", "UPLOADED", "INDEXED", name="pdfstatus"),
+        existing_nullable=True
+    )
@@ -1,22 +1,71 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import os
-from .database import engine
+from .database import engine, ro_engine, warm_up_pool
 from .models import Base
+from .services.deps import get_chat
+from .services.opensearch_service import warm_up_embedding_model
 
-# Create database tables
-try:
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created successfully")
-except Exception as e:
-    print(f"⚠️  Database connection failed: {e}")
-    print("📝 Running in development mode without database")
+async def warm_up_services():
+    """Build the shared services and check that Ollama is reachable"""
+    try:
+        # Building the services talks to OpenSearch synchronously
+        chat_service = await asyncio.to_thread(get_chat)
+        await chat_service.test_connection()
+    except Exception as e:
+        print(f"⚠️  Service initialization failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema is managed by Alembic; only introspect/create tables when asked to
+    if os.getenv("APP_RUN_MIGRATIONS") == "1":
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            print("✅ Database tables created successfully")
+            print("📝 On a new database, run 'alembic stamp head' once before using migrations")
+        except Exception as e:
+            print(f"⚠️  Database connection failed: {e}")
+            print("📝 Running in development mode without database")
+
+    for db_engine in {engine, ro_engine}:
+        try:
+            warmed = await warm_up_pool(db_engine)
+            print(f"✅ Opened {warmed} database connections")
+        except Exception as e:
+            print(f"⚠️  Database pool warm-up failed: {e}")
+
+    # Load the embedding model before serving so the first search isn't slow
+    try:
+        await asyncio.to_thread(warm_up_embedding_model)
+        print("✅ Embedding model loaded")
+    except Exception as e:
+        print(f"⚠️  Embedding model warm-up failed: {e}")
+
+    # Runs in the background so slow dependencies don't hold up startup
+    warm_up = asyncio.create_task(warm_up_services())
+
+    yield
+
+    warm_up.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up
+    if get_chat.cache_info().currsize:
+        await get_chat().aclose()
+    if ro_engine is not engine:
+        await ro_engine.dispose()
+    await engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title="PDF Management API",
     description="A FastAPI application for managing PDF uploads, storage, and analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Enum, Index, text
+from sqlalchemy.dialects.mysql import DATETIME
 from sqlalchemy.sql import func
 from .database import Base
 import enum
@@ -6,19 +7,36 @@ import enum
 class PDFStatus(enum.Enum):
     PENDING = "PENDING"
     UPLOADED = "UPLOADED"
+    PROCESSING = "PROCESSING"
     INDEXED = "INDEXED"
 
 class PDF(Base):
     __tablename__ = "pdfs"
     
     id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String(255), nullable=False)
-    s3_key = Column(String(500), nullable=False)
+    filename = Column(String(255), nullable=False, index=True, unique=True)
+    s3_key = Column(String(500), nullable=False, index=True, unique=True)
     file_size = Column(Integer)
     upload_date = Column(DateTime(timezone=True), server_default=func.now())
-    status = Column(Enum(PDFStatus), default=PDFStatus.PENDING)
-    vector_index_id = Column(String(255), nullable=True)
+    status = Column(
+        Enum(PDFStatus, native_enum=True, values_callable=lambda x: [e.value for e in x]),
+        default=PDFStatus.PENDING
+    )
+    vector_index_id = Column(String(64), nullable=True)
     content_summary = Column(Text, nullable=True)
+    # Maintained by MySQL on every row change; microsecond precision so the
+    # listing ETags change even for several updates within one second
+    updated_at = Column(
+        DATETIME(fsp=6),
+        nullable=False,
+        index=True,
+        server_default=text("CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)")
+    )
+    
+    __table_args__ = (
+        # Serves status-filtered listings newest first without a filesort
+        Index("ix_pdfs_status_upload_date", status, upload_date.desc()),
+    )
     
     def __repr__(self):
         return f"<PDF(id={self.id}, filename='{self.filename}', s3_key='{self.s3_key}', status='{self.status.value}')>" 
\ No newline at end of file
@@ -1,37 +1,183 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update, func, text, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import hashlib
+import asyncio
+import functools
+import json
+import os
 import uuid
 
-from ..database import get_db
+from ..database import SessionLocal, get_db, get_db_ro
 from ..models import PDF, PDFStatus
 from ..schemas import (
     PDFUploadRequest, PDFUploadResponse, PDFConfirmRequest, 
+    PDFMultipartUploadRequest, PDFMultipartUploadResponse, PDFMultipartCompleteRequest,
+    PDFMultipartAbortRequest,
     PDFConfirmResponse, PDFParseRequest, PDFParseResponse,
+    PDFDeleteResponse, PDFMetadata, PDFPageResponse, PDFCollectionResponse,
     ChatRequest, ChatResponse
 )
 from ..services.s3_service import S3Service
 from ..services.opensearch_service import OpenSearchService
 from ..services.chat_service import ChatService
+from ..services.deps import get_s3, get_opensearch, get_chat
 
 router = APIRouter(tags=["pdf-upload"])
 
-# Initialize services
-s3_service = S3Service()
-opensearch_service = OpenSearchService()
-chat_service = ChatService()
+# Per-process cache of PDF metadata keyed by id. This process writes fresh
+# metadata through on every change (so reads don't depend on replica lag);
+# changes made by other app replicas show up once the TTL expires
+_pdf_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_pdf_cache_lock = threading.Lock()
+# Bumped on every cache write, so a miss that read the (possibly lagging)
+# replica while a write happened doesn't overwrite the newer entry
+_pdf_cache_version = 0
+
+def _invalidate_pdf_cache(pdf_id: int):
+    global _pdf_cache_version
+    with _pdf_cache_lock:
+        _pdf_cache_version += 1
+        _pdf_cache.pop(pdf_id, None)
+
+def _store_pdf_cache(pdf: PDF):
+    global _pdf_cache_version
+    metadata = PDFMetadata.model_validate(pdf)
+    with _pdf_cache_lock:
+        _pdf_cache_version += 1
+        _pdf_cache[pdf.id] = metadata
+
+async def _get_pdf_cached(pdf_id: int, db: AsyncSession) -> Optional[PDFMetadata]:
+    """Return PDF metadata from the cache, loading it from the database on a miss"""
+    with _pdf_cache_lock:
+        cached = _pdf_cache.get(pdf_id)
+        version = _pdf_cache_version
+    if cached is not None:
+        return cached
+
+    result = await db.execute(select(PDF).where(PDF.id == pdf_id))
+    pdf = result.scalar_one_or_none()
+    if pdf is None:
+        return None
+
+    metadata = PDFMetadata.model_validate(pdf)
+    with _pdf_cache_lock:
+        if _pdf_cache_version == version:
+            _pdf_cache[pdf_id] = metadata
+    return metadata
+
+# InnoDB's table_rows estimate is O(1) to read but can be far off on small
+# tables, so it only replaces COUNT(*) once the table is large. It relies on
+# the connection's information_schema_stats_expiry=0 (see DB_INIT_COMMAND) to
+# read current statistics rather than MySQL's day-long cached copy
+APPROX_COUNT_MIN_ROWS = 10_000
+_row_count_cache: TTLCache = TTLCache(maxsize=16, ttl=30)
+_row_count_cache_lock = threading.Lock()
+
+async def _approx_row_count(db: AsyncSession, table: str) -> int:
+    """Return MySQL's estimated row count for a table, cached for a short time"""
+    with _row_count_cache_lock:
+        cached = _row_count_cache.get(table)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(
+        text(
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = :t"
+        ),
+        {"t": table}
+    )
+    count = result.scalar() or 0
+    with _row_count_cache_lock:
+        _row_count_cache[table] = count
+    return count
+
+# Listing responses carry an ETag derived from the newest change and the row
+# count, so unchanged listings can be answered with 304 Not Modified. The
+# count catches deletes from any app replica, which MAX(updated_at) can't see;
+# InnoDB serves it from the smallest index and it runs at most once per stamp
+# lifetime (or after a local write)
+LISTING_CACHE_CONTROL = "private, max-age=5"
+_listing_stamp_cache: TTLCache = TTLCache(maxsize=1, ttl=5)
+_listing_stamp_lock = threading.Lock()
+
+def _invalidate_listing_stamp():
+    with _listing_stamp_lock:
+        _listing_stamp_cache.clear()
+
+async def _listing_stamp(db: AsyncSession) -> str:
+    """Return a short-lived summary of the pdfs table that changes on every write"""
+    with _listing_stamp_lock:
+        cached = _listing_stamp_cache.get("pdfs")
+    if cached is not None:
+        return cached
+
+    result = await db.execute(select(func.max(PDF.updated_at), func.count(PDF.id)))
+    last_update, count = result.one()
+    stamp = f"{last_update}|{count}"
+    with _listing_stamp_lock:
+        _listing_stamp_cache["pdfs"] = stamp
+    return stamp
+
+def _make_etag(value: str) -> str:
+    return '"' + hashlib.blake2b(value.encode(), digest_size=8).hexdigest() + '"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client already holds the representation for this ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+def _not_modified_response(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": LISTING_CACHE_CONTROL}
+    )
 
 @router.post("/upload-pdf", response_model=PDFUploadResponse)
-async def upload_pdf(request: PDFUploadRequest, db: Session = Depends(get_db)):
+async def upload_pdf(
+    request: PDFUploadRequest,
+    db: AsyncSession = Depends(get_db),
+    s3_service: S3Service = Depends(get_s3)
+):
     """Generate a pre-signed URL for uploading a PDF file and create a pending record"""
     try:
-        # Check if PDF with same filename already exists
-        existing_pdf = db.query(PDF).filter(PDF.filename == request.filename).first()
+        # Generate pre-signed URL and S3 key
+        presigned_url, s3_key = s3_service.generate_presigned_url(s3_key="", filename=request.filename)
+        
+        # Create PDF record in database with PENDING status. Inserting first and
+        # letting the unique filename index reject duplicates saves the lookup
+        # for new files and can't race with a concurrent upload of the same name
+        pdf_record = PDF(
+            filename=request.filename,
+            s3_key=s3_key,
+            status=PDFStatus.PENDING
+        )
         
-        if existing_pdf:
+        # The primary key is populated from the INSERT's lastrowid, and the
+        # session doesn't expire on commit, so no refresh SELECT is needed
+        db.add(pdf_record)
+        try:
+            await db.commit()
+            _invalidate_listing_stamp()
+        except IntegrityError:
+            await db.rollback()
+            result = await db.execute(select(PDF).where(PDF.filename == request.filename))
+            existing_pdf = result.scalar_one_or_none()
+            if existing_pdf is None:
+                raise
+            
             # If PDF exists and is in PENDING status, return existing record
             if existing_pdf.status == PDFStatus.PENDING:
-                presigned_url, s3_key = s3_service.generate_presigned_url(s3_key="", filename=request.filename)
                 return PDFUploadResponse(
                     upload_url=presigned_url,
                     pdf_id=existing_pdf.id,
@@ -43,39 +189,135 @@ async def upload_pdf(request: PDFUploadRequest, db: Session = Depends(get_db)):
                     detail=f"PDF with filename '{request.filename}' already exists with status {existing_pdf.status.value}"
                 )
         
-        # Generate pre-signed URL and S3 key
-        presigned_url, s3_key = s3_service.generate_presigned_url(s3_key="", filename=request.filename)
-        
-        # Create PDF record in database with PENDING status
-        pdf_record = PDF(
-            filename=request.filename,
-            s3_key=s3_key,
-            status=PDFStatus.PENDING
-        )
-        
-        db.add(pdf_record)
-        db.commit()
-        db.refresh(pdf_record)
-        
         return PDFUploadResponse(
             upload_url=presigned_url,
             pdf_id=pdf_record.id,
             s3_key=s3_key
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating upload URL: {str(e)}"
         )
 
+async def _get_pending_pdf(pdf_id: int, db: AsyncSession) -> PDF:
+    """Load a PDF that is still waiting for its upload, or raise"""
+    result = await db.execute(select(PDF).where(PDF.id == pdf_id))
+    pdf = result.scalar_one_or_none()
+    
+    if not pdf:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF not found"
+        )
+    
+    if pdf.status != PDFStatus.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF status is {pdf.status.value}, expected PENDING"
+        )
+    
+    return pdf
+
+@router.post("/upload-pdf-multipart", response_model=PDFMultipartUploadResponse)
+async def start_multipart_upload(
+    request: PDFMultipartUploadRequest,
+    db: AsyncSession = Depends(get_db),
+    s3_service: S3Service = Depends(get_s3)
+):
+    """Start a multipart upload for a pending PDF so large files can be sent as parallel parts"""
+    try:
+        pdf = await _get_pending_pdf(request.pdf_id, db)
+        
+        upload_id, part_size, part_urls = await asyncio.to_thread(
+            s3_service.create_multipart_upload, pdf.s3_key, request.file_size
+        )
+        
+        return PDFMultipartUploadResponse(
+            pdf_id=pdf.id,
+            upload_id=upload_id,
+            part_size=part_size,
+            part_urls=part_urls
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error starting multipart upload: {str(e)}"
+        )
+
+@router.post("/upload-pdf-multipart-complete", response_model=PDFConfirmResponse)
+async def complete_multipart_upload(
+    request: PDFMultipartCompleteRequest,
+    db: AsyncSession = Depends(get_db),
+    s3_service: S3Service = Depends(get_s3)
+):
+    """Assemble the uploaded parts; confirm the upload afterwards as usual"""
+    try:
+        pdf = await _get_pending_pdf(request.pdf_id, db)
+        
+        parts = [{"PartNumber": part.part_number, "ETag": part.etag} for part in request.parts]
+        await asyncio.to_thread(
+            s3_service.complete_multipart_upload, pdf.s3_key, request.upload_id, parts
+        )
+        
+        return PDFConfirmResponse(
+            message="Multipart upload completed successfully",
+            pdf_id=pdf.id
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error completing multipart upload: {str(e)}"
+        )
+
+@router.post("/upload-pdf-multipart-abort", response_model=PDFConfirmResponse)
+async def abort_multipart_upload(
+    request: PDFMultipartAbortRequest,
+    db: AsyncSession = Depends(get_db),
+    s3_service: S3Service = Depends(get_s3)
+):
+    """Abandon a multipart upload so S3 stops storing its parts"""
+    try:
+        pdf = await _get_pending_pdf(request.pdf_id, db)
+        
+        await asyncio.to_thread(
+            s3_service.abort_multipart_upload, pdf.s3_key, request.upload_id
+        )
+        
+        return PDFConfirmResponse(
+            message="Multipart upload aborted",
+            pdf_id=pdf.id
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error aborting multipart upload: {str(e)}"
+        )
+
 @router.post("/upload-pdf-confirm", response_model=PDFConfirmResponse)
-async def confirm_pdf_upload(request: PDFConfirmRequest, db: Session = Depends(get_db)):
+async def confirm_pdf_upload(
+    request: PDFConfirmRequest,
+    db: AsyncSession = Depends(get_db),
+    s3_service: S3Service = Depends(get_s3)
+):
     """Confirm that PDF has been uploaded and update status to UPLOADED"""
     try:
         # Find PDF by ID
-        pdf = db.query(PDF).filter(PDF.id == request.pdf_id).first()
+        result = await db.execute(select(PDF).where(PDF.id == request.pdf_id))
+        pdf = result.scalar_one_or_none()
         
         if not pdf:
             raise HTTPException(
@@ -93,11 +335,14 @@ async def confirm_pdf_upload(request: PDFConfirmRequest, db: Session = Depends(g
         pdf.status = PDFStatus.UPLOADED
         
         # Get file size from S3
-        file_size = s3_service.get_file_size(pdf.s3_key)
+        file_size = await s3_service.get_file_size_async(pdf.s3_key)
         if file_size:
             pdf.file_size = file_size
         
-        db.commit()
+        _invalidate_pdf_cache(pdf.id)
+        await db.commit()
+        _store_pdf_cache(pdf)
+        _invalidate_listing_stamp()
         
         return PDFConfirmResponse(
             message="PDF upload confirmed successfully",
@@ -107,18 +352,92 @@ async def confirm_pdf_upload(request: PDFConfirmRequest, db: Session = Depends(g
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error confirming PDF upload: {str(e)}"
         )
 
-@router.post("/parse-pdf", response_model=PDFParseResponse)
-async def parse_pdf(request: PDFParseRequest, db: Session = Depends(get_db)):
-    """Parse PDF and index content into OpenSearch"""
+# A PDF left in PROCESSING longer than this is assumed to belong to a run that
+# died with its pod, and may be parsed again or deleted
+PROCESSING_TIMEOUT_SECONDS = int(os.getenv('PDF_PROCESSING_TIMEOUT', 3600))
+
+def _processing_is_stale():
+    """SQL condition for a PROCESSING claim that has outlived the timeout"""
+    return and_(
+        PDF.status == PDFStatus.PROCESSING,
+        PDF.updated_at < func.timestampadd(text("SECOND"), -PROCESSING_TIMEOUT_SECONDS, func.current_timestamp())
+    )
+
+# Indexing runs for minutes per PDF; a dedicated pool keeps it from occupying
+# the default executor that request handlers offload short blocking calls to
+PDF_INDEXING_WORKERS = int(os.getenv('PDF_INDEXING_WORKERS', 2))
+_indexing_executor = ThreadPoolExecutor(max_workers=PDF_INDEXING_WORKERS, thread_name_prefix="pdf-indexing")
+
+async def _remove_indexed_segments(pdf_id: int, opensearch_service: OpenSearchService):
+    """Drop whatever an indexing run wrote for a PDF"""
+    try:
+        await opensearch_service.delete_pdf_from_index_async(f"pdf_{pdf_id}")
+    except Exception as e:
+        print(f"Error removing index segments of PDF {pdf_id}: {e}")
+
+async def _run_indexing(pdf_id: int, filename: str, s3_key: str, opensearch_service: OpenSearchService):
+    """Background task: extract, embed and index a PDF, then record the outcome"""
+    try:
+        # The pipeline is blocking and CPU heavy, keep it off the event loop
+        vector_index_id = await asyncio.get_running_loop().run_in_executor(
+            _indexing_executor,
+            functools.partial(
+                opensearch_service.analyze_and_index_pdf,
+                pdf_id=pdf_id,
+                filename=filename,
+                s3_key=s3_key
+            )
+        )
+    except Exception as e:
+        print(f"Error parsing PDF {pdf_id}: {e}")
+        vector_index_id = None
+        # A partial run leaves segments that chat would serve as sources
+        await _remove_indexed_segments(pdf_id, opensearch_service)
+
+    try:
+        async with SessionLocal() as db:
+            pdf = await db.get(PDF, pdf_id)
+            if pdf is None:
+                # Deleted while it was being processed; the delete may have
+                # run before this task wrote its segments
+                if vector_index_id:
+                    await _remove_indexed_segments(pdf_id, opensearch_service)
+                return
+            
+            if vector_index_id:
+                pdf.status = PDFStatus.INDEXED
+                pdf.vector_index_id = vector_index_id
+                pdf.content_summary = "PDF content has been extracted, embedded, and indexed in vector database"
+            else:
+                # Put it back so parsing can be retried
+                pdf.status = PDFStatus.UPLOADED
+            
+            _invalidate_pdf_cache(pdf_id)
+            await db.commit()
+            _store_pdf_cache(pdf)
+            _invalidate_listing_stamp()
+    except Exception as e:
+        print(f"Error updating PDF {pdf_id} after parsing: {e}")
+
+@router.post("/parse-pdf", response_model=PDFParseResponse, status_code=status.HTTP_202_ACCEPTED)
+async def parse_pdf(
+    request: PDFParseRequest,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    opensearch_service: OpenSearchService = Depends(get_opensearch)
+):
+    """Queue a PDF for parsing and indexing into OpenSearch"""
     try:
         # Find PDF by ID
-        pdf = db.query(PDF).filter(PDF.id == request.pdf_id).first()
+        result = await db.execute(select(PDF).where(PDF.id == request.pdf_id))
+        pdf = result.scalar_one_or_none()
         
         if not pdf:
             raise HTTPException(
@@ -138,96 +457,226 @@ async def parse_pdf(request: PDFParseRequest, db: Session = Depends(get_db)):
                 detail="PDF has not been uploaded yet. Please upload and confirm first."
             )
         
-        # Analyze and index PDF
-        vector_index_id = opensearch_service.analyze_and_index_pdf(
-            pdf_id=pdf.id,
-            filename=pdf.filename,
-            s3_key=pdf.s3_key
+        # Claim the PDF only if it is still UPLOADED (or its previous run went
+        # stale), so concurrent requests can't queue the same file twice.
+        # updated_at is set explicitly: re-claiming a stale row leaves status
+        # unchanged, which wouldn't trigger ON UPDATE
+        claimed = await db.execute(
+            update(PDF)
+            .where(PDF.id == pdf.id, or_(PDF.status == PDFStatus.UPLOADED, _processing_is_stale()))
+            .values(status=PDFStatus.PROCESSING, updated_at=text("CURRENT_TIMESTAMP(6)"))
+            .execution_options(synchronize_session=False)
         )
+        if claimed.rowcount == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="PDF is already being processed"
+            )
+        
+        _invalidate_pdf_cache(pdf.id)
+        await db.commit()
+        await db.refresh(pdf)
+        _store_pdf_cache(pdf)
+        _invalidate_listing_stamp()
+        
+        pdf_id, filename, s3_key = pdf.id, pdf.filename, pdf.s3_key
         
-        # Update PDF record
-        pdf.status = PDFStatus.INDEXED
-        pdf.vector_index_id = vector_index_id
-        pdf.content_summary = "PDF content has been extracted, embedded, and indexed in vector database"
+        # Release the connection now rather than after the background task
+        await db.close()
         
-        db.commit()
+        background_tasks.add_task(_run_indexing, pdf_id, filename, s3_key, opensearch_service)
+        response.headers["Location"] = f"/pdfs/{pdf_id}"
         
         return PDFParseResponse(
-            message="PDF parsed and indexed successfully",
-            pdf_id=pdf.id,
-            vector_index_id=vector_index_id
+            message="PDF queued for parsing and indexing",
+            pdf_id=pdf_id
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error parsing PDF: {str(e)}"
         )
 
-@router.get("/list-pdfs")
-async def list_pdfs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/list-pdfs", response_model=PDFPageResponse)
+async def list_pdfs(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db_ro)
+):
     """List all PDFs with pagination"""
     try:
-        pdfs = db.query(PDF).offset(skip).limit(limit).all()
-        total_count = db.query(PDF).count()
-        
-        return {
-            "pdfs": [
-                {
-                    "id": pdf.id,
-                    "filename": pdf.filename,
-                    "s3_key": pdf.s3_key,
-                    "status": pdf.status.value,
-                    "file_size": pdf.file_size,
-                    "upload_date": pdf.upload_date.isoformat() if pdf.upload_date else None,
-                    "vector_index_id": pdf.vector_index_id,
-                    "content_summary": pdf.content_summary
-                }
-                for pdf in pdfs
-            ],
-            "total_count": total_count,
-            "skip": skip,
-            "limit": limit
-        }
+        etag = _make_etag(f"{await _listing_stamp(db)}|{skip}|{limit}")
+        if _not_modified(request, etag):
+            return _not_modified_response(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = LISTING_CACHE_CONTROL
+        
+        # The first page of a large table is served with an estimated total
+        if skip == 0 and limit >= 100:
+            approx_count = await _approx_row_count(db, PDF.__tablename__)
+            if approx_count >= APPROX_COUNT_MIN_ROWS:
+                result = await db.execute(select(PDF).order_by(PDF.id).limit(limit))
+                pdfs = result.scalars().all()
+                # A short page means the whole table fit, so the count is exact
+                total_count = len(pdfs) if len(pdfs) < limit else max(approx_count, len(pdfs))
+                return PDFPageResponse(
+                    pdfs=[PDFMetadata.model_validate(pdf) for pdf in pdfs],
+                    total_count=total_count,
+                    skip=skip,
+                    limit=limit
+                )
+        
+        # Fetch the page and the total row count in a single round trip. The
+        # window count runs over an id-only derived table, so MySQL buffers
+        # primary keys rather than whole rows (TEXT columns included)
+        page = (
+            select(PDF.id, func.count().over().label("total"))
+            .order_by(PDF.id)
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        result = await db.execute(
+            select(PDF, page.c.total).join(page, PDF.id == page.c.id).order_by(PDF.id)
+        )
+        rows = result.all()
+        pdfs = [row.PDF for row in rows]
+        if rows:
+            total_count = rows[0].total
+        elif skip > 0:
+            # Page past the end carries no window total, count separately
+            total_count = (await db.execute(select(func.count(PDF.id)))).scalar()
+        else:
+            total_count = 0
+        
+        return PDFPageResponse(
+            pdfs=[PDFMetadata.model_validate(pdf) for pdf in pdfs],
+            total_count=total_count,
+            skip=skip,
+            limit=limit
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving PDFs: {str(e)}"
         )
 
-@router.get("/pdfs")
-async def get_all_pdfs(db: Session = Depends(get_db)):
+@router.get("/pdfs", response_model=PDFCollectionResponse)
+async def get_all_pdfs(request: Request, response: Response, db: AsyncSession = Depends(get_db_ro)):
     """Get all PDFs without pagination (simple list)"""
     try:
-        pdfs = db.query(PDF).all()
-        return {"pdfs": [
-            {
-                "id": pdf.id,
-                "filename": pdf.filename,
-                "s3_key": pdf.s3_key,
-                "status": pdf.status.value,
-                "file_size": pdf.file_size,
-                "upload_date": pdf.upload_date.isoformat() if pdf.upload_date else None,
-                "vector_index_id": pdf.vector_index_id,
-                "content_summary": pdf.content_summary
-            }
-            for pdf in pdfs
-        ]}
+        etag = _make_etag(await _listing_stamp(db))
+        if _not_modified(request, etag):
+            return _not_modified_response(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = LISTING_CACHE_CONTROL
+        
+        result = await db.execute(select(PDF))
+        pdfs = result.scalars().all()
+        return PDFCollectionResponse(pdfs=[PDFMetadata.model_validate(pdf) for pdf in pdfs])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving PDFs: {str(e)}"
         )
 
+@router.get("/pdfs/{pdf_id}", response_model=PDFMetadata)
+async def get_pdf(pdf_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db_ro)):
+    """Get metadata for a single PDF"""
+    try:
+        pdf = await _get_pdf_cached(pdf_id, db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving PDF: {str(e)}"
+        )
+
+    if not pdf:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF not found"
+        )
+
+    etag = _make_etag(pdf.model_dump_json())
+    if _not_modified(request, etag):
+        return _not_modified_response(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = LISTING_CACHE_CONTROL
+
+    return pdf
+
+@router.delete("/pdfs/{pdf_id}", response_model=PDFDeleteResponse)
+async def delete_pdf(
+    pdf_id: int,
+    db: AsyncSession = Depends(get_db),
+    s3_service: S3Service = Depends(get_s3),
+    opensearch_service: OpenSearchService = Depends(get_opensearch)
+):
+    """Delete a PDF from S3, the vector index, and the database"""
+    try:
+        result = await db.execute(select(PDF).where(PDF.id == pdf_id))
+        pdf = result.scalar_one_or_none()
+        
+        if not pdf:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="PDF not found"
+            )
+        
+        if pdf.status == PDFStatus.PROCESSING and not (await db.execute(
+            select(_processing_is_stale()).where(PDF.id == pdf.id)
+        )).scalar():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="PDF is being processed, try again once indexing has finished"
+            )
+        
+        # S3 and the vector index are independent, remove from both concurrently.
+        # Exceptions are collected so one failure doesn't cancel the other
+        # The index delete runs even without a vector_index_id: a failed
+        # indexing run can leave segments behind, and deleting is idempotent
+        tasks = [
+            s3_service.delete_file_async(pdf.s3_key),
+            opensearch_service.delete_pdf_from_index_async(pdf.vector_index_id or f"pdf_{pdf.id}")
+        ]
+        errors = [r for r in await asyncio.gather(*tasks, return_exceptions=True) if isinstance(r, Exception)]
+        
+        # Keep the record on partial failure so the delete can be retried
+        if errors:
+            raise Exception("; ".join(str(e) for e in errors))
+        
+        await db.delete(pdf)
+        await db.commit()
+        # After the commit, so a concurrent read can't re-cache the row
+        _invalidate_pdf_cache(pdf_id)
+        _invalidate_listing_stamp()
+        
+        return PDFDeleteResponse(
+            message="PDF deleted successfully",
+            pdf_id=pdf_id
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deleting PDF: {str(e)}"
+        )
+
 @router.post("/chat", response_model=ChatResponse)
-async def chat_with_pdfs(request: ChatRequest):
+async def chat_with_pdfs(request: ChatRequest, chat_service: ChatService = Depends(get_chat)):
     """Chat with the AI assistant using RAG or direct LLM"""
     try:
         # Use the chat service to generate response
-        response, sources = chat_service.chat(
+        response, sources = await chat_service.chat(
             query=request.query,
             use_knowledge=request.use_knowledge
         )
@@ -242,4 +691,28 @@ async def chat_with_pdfs(request: ChatRequest):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error in chat: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/chat/stream")
+async def chat_with_pdfs_stream(request: ChatRequest, chat_service: ChatService = Depends(get_chat)):
+    """Chat like /chat, streaming the answer as newline-delimited JSON.
+
+    The first line carries the sources, each following line one response token.
+    """
+    try:
+        tokens, sources = await chat_service.chat_stream(
+            query=request.query,
+            use_knowledge=request.use_knowledge
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error in chat: {str(e)}"
+        )
+
+    async def ndjson():
+        yield json.dumps({"sources": sources if request.use_knowledge else None}) + "\n"
+        async for token in tokens:
+            yield json.dumps({"response": token}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional
 from .models import PDFStatus
@@ -11,6 +11,30 @@ class PDFUploadResponse(BaseModel):
     pdf_id: int
     s3_key: str
 
+class PDFMultipartUploadRequest(BaseModel):
+    pdf_id: int
+    # S3 objects are limited to 5 TiB
+    file_size: int = Field(gt=0, le=5 * 1024**4)
+
+class PDFMultipartUploadResponse(BaseModel):
+    pdf_id: int
+    upload_id: str
+    part_size: int
+    part_urls: list[str]
+
+class PDFUploadPart(BaseModel):
+    part_number: int
+    etag: str
+
+class PDFMultipartCompleteRequest(BaseModel):
+    pdf_id: int
+    upload_id: str
+    parts: list[PDFUploadPart]
+
+class PDFMultipartAbortRequest(BaseModel):
+    pdf_id: int
+    upload_id: str
+
 class PDFConfirmRequest(BaseModel):
     pdf_id: int
 
@@ -24,25 +48,35 @@ class PDFParseRequest(BaseModel):
 class PDFParseResponse(BaseModel):
     message: str
     pdf_id: int
-    vector_index_id: str
+    vector_index_id: Optional[str] = None
+
+class PDFDeleteResponse(BaseModel):
+    message: str
+    pdf_id: int
 
 class PDFMetadata(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     filename: str
     s3_key: str
     file_size: Optional[int]
-    upload_date: datetime
+    upload_date: Optional[datetime]
     status: PDFStatus
     vector_index_id: Optional[str]
     content_summary: Optional[str]
-    
-    class Config:
-        from_attributes = True
 
 class PDFListResponse(BaseModel):
     pdfs: list[PDFMetadata]
     total_count: int
 
+class PDFPageResponse(PDFListResponse):
+    skip: int
+    limit: int
+
+class PDFCollectionResponse(BaseModel):
+    pdfs: list[PDFMetadata]
+
 class AnalysisResponse(BaseModel):
     message: str
     pdf_id: int
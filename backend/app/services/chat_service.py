@@ -1,22 +1,33 @@
 import os
-import requests
-from typing import List, Optional
+import json
+import asyncio
+import httpx
+from typing import AsyncIterator, List, Optional
 from ..services.opensearch_service import OpenSearchService
 
 class ChatService:
-    def __init__(self):
-        self.ollama_url = os.getenv("CHAT_INFERENCE_URL", "http://localhost:11434") + "/api/generate"
+    def __init__(self, opensearch_service: OpenSearchService):
+        self.base_url = os.getenv("CHAT_INFERENCE_URL", "http://localhost:11434")
         self.model_name = "llama3.3"
-        self.opensearch_service = OpenSearchService()
+        self.opensearch_service = opensearch_service
         
-        # Test Ollama connection on initialization
-        self._test_ollama_connection()
+        # Keep-alive client shared by all calls to Ollama, so the event loop is
+        # free while the LLM works; the read timeout applies between streamed
+        # chunks. Connection failures are retried
+        self._aclient = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            # With an explicit transport, the pool limits must be set on it
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_keepalive_connections=20)
+            )
+        )
     
-    def _test_ollama_connection(self):
+    async def test_connection(self):
         """Test connection to Ollama endpoint"""
         try:
-            base_url = os.getenv("CHAT_INFERENCE_URL", "http://localhost:11434")
-            response = requests.get(f"{base_url}/api/tags", timeout=5)
+            response = await self._aclient.get("/api/tags", timeout=5)
             if response.status_code == 200:
                 print("✅ Ollama connection successful")
                 return True
@@ -27,6 +38,10 @@ class ChatService:
             print(f"⚠️ Ollama connection failed: {e}")
             return False
     
+    async def aclose(self):
+        """Release pooled HTTP connections"""
+        await self._aclient.aclose()
+    
     def _format_prompt(self, query: str, context: Optional[str] = None) -> str:
         """Format the prompt for Llama 3.3"""
         if context:
@@ -54,26 +69,26 @@ You are a helpful AI assistant. Answer the user's question to the best of your a
 """
         return prompt
     
-    def _generate_response(self, prompt: str) -> str:
+    def _build_payload(self, prompt: str, stream: bool) -> dict:
+        """Build the request payload for the Ollama generate API"""
+        return {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "max_tokens": 512
+            }
+        }
+    
+    async def _generate_response(self, prompt: str) -> str:
         """Generate response using Ollama API"""
         try:
-            # Prepare the request payload for Ollama
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 512
-                }
-            }
-            
-            # Make request to Ollama
-            response = requests.post(
-                self.ollama_url,
-                json=payload,
-                timeout=30
+            # Make request to Ollama without blocking the event loop
+            response = await self._aclient.post(
+                "/api/generate",
+                json=self._build_payload(prompt, stream=False)
             )
             
             if response.status_code == 200:
@@ -89,16 +104,50 @@ You are a helpful AI assistant. Answer the user's question to the best of your a
                 print(f"Ollama API error: {response.status_code} - {response.text}")
                 return "I apologize, but there was an error communicating with the language model. Please try again."
                 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             print("Ollama API request timed out")
             return "I apologize, but the request timed out. Please try again."
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             print("Failed to connect to Ollama API")
             return "I apologize, but I cannot connect to the language model service. Please check if the Ollama service is running."
         except Exception as e:
             print(f"Error generating response: {e}")
             return "I apologize, but there was an error generating the response. Please try again."
     
+    async def _stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """Yield response tokens from the Ollama API as they are generated"""
+        try:
+            async with self._aclient.stream(
+                "POST",
+                "/api/generate",
+                json=self._build_payload(prompt, stream=True)
+            ) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    print(f"Ollama API error: {response.status_code} - {body.decode(errors='replace')}")
+                    yield "I apologize, but there was an error communicating with the language model. Please try again."
+                    return
+                
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    token = chunk.get('response', '')
+                    if token:
+                        yield token
+                    if chunk.get('done'):
+                        break
+                        
+        except httpx.TimeoutException:
+            print("Ollama API request timed out")
+            yield "I apologize, but the request timed out. Please try again."
+        except httpx.ConnectError:
+            print("Failed to connect to Ollama API")
+            yield "I apologize, but I cannot connect to the language model service. Please check if the Ollama service is running."
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            yield "I apologize, but there was an error generating the response. Please try again."
+    
     def _search_knowledge_base(self, query: str) -> tuple[Optional[str], List[str]]:
         """Search the OpenSearch knowledge base for relevant context"""
         try:
@@ -125,19 +174,31 @@ You are a helpful AI assistant. Answer the user's question to the best of your a
             print(f"Error searching knowledge base: {e}")
             return None, []
     
-    def chat(self, query: str, use_knowledge: bool = True) -> tuple[str, List[str]]:
-        """Main chat method that handles both RAG and direct LLM queries"""
+    async def _prepare_prompt(self, query: str, use_knowledge: bool) -> tuple[str, List[str]]:
+        """Look up context if requested and build the prompt"""
         context = None
         sources = []
         
         if use_knowledge:
-            # Search knowledge base for relevant context
-            context, sources = self._search_knowledge_base(query)
+            # Embedding and vector search are blocking, run them off the event loop
+            context, sources = await asyncio.to_thread(self._search_knowledge_base, query)
         
         # Format prompt with or without context
         prompt = self._format_prompt(query, context)
         
+        return prompt, sources
+    
+    async def chat(self, query: str, use_knowledge: bool = True) -> tuple[str, List[str]]:
+        """Main chat method that handles both RAG and direct LLM queries"""
+        prompt, sources = await self._prepare_prompt(query, use_knowledge)
+        
         # Generate response
-        response = self._generate_response(prompt)
+        response = await self._generate_response(prompt)
+        
+        return response, sources
+    
+    async def chat_stream(self, query: str, use_knowledge: bool = True) -> tuple[AsyncIterator[str], List[str]]:
+        """Like chat(), but returns the response as an async iterator of tokens"""
+        prompt, sources = await self._prepare_prompt(query, use_knowledge)
         
-        return response, sources 
\ No newline at end of file
+        return self._stream_response(prompt), sources
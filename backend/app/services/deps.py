@@ -0,0 +1,34 @@
+from functools import lru_cache, wraps
+import threading
+
+from .s3_service import S3Service
+from .opensearch_service import OpenSearchService
+from .chat_service import ChatService
+
+# Services are created lazily, once per process, and shared by every router
+
+def _singleton(factory):
+    """Cache a factory's result, serializing calls so concurrent first callers
+    (startup warm-up and the first requests) don't each build a service"""
+    cached = lru_cache(maxsize=1)(factory)
+    lock = threading.Lock()
+
+    @wraps(factory)
+    def get():
+        with lock:
+            return cached()
+
+    get.cache_info = cached.cache_info
+    return get
+
+@_singleton
+def get_s3() -> S3Service:
+    return S3Service()
+
+@_singleton
+def get_opensearch() -> OpenSearchService:
+    return OpenSearchService()
+
+@_singleton
+def get_chat() -> ChatService:
+    return ChatService(opensearch_service=get_opensearch())
@@ -1,14 +1,246 @@
 import os
-from opensearchpy import OpenSearch
-from opensearchpy.exceptions import NotFoundError
-import boto3
+
+# Hyperthreads share execution units, so default to one thread per physical
+# core. Must be set before torch/numpy load their thread pools
+EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', max(1, (os.cpu_count() or 2) // 2)))
+os.environ.setdefault('OMP_NUM_THREADS', str(EMBEDDING_THREADS))
+os.environ.setdefault('MKL_NUM_THREADS', str(EMBEDDING_THREADS))
+
+import asyncio
+from opensearchpy import OpenSearch, JSONSerializer, helpers
+from opensearchpy.exceptions import NotFoundError, RequestError
+from .s3_service import get_s3_client, DOWNLOAD_TRANSFER_CONFIG
+from .pdf_text import count_pages, extract_page_texts
 import io
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import orjson
 import uuid
+from functools import lru_cache
 from typing import List, Dict, Any
 from datetime import datetime
-from langchain_core.documents.base import Blob
-from langchain_community.document_loaders.parsers import PyMuPDFParser
 from sentence_transformers import SentenceTransformer
+import torch
+
+torch.set_num_threads(EMBEDDING_THREADS)
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    # Only allowed before torch starts any inter-op work
+    pass
+
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_DEVICE = 'cuda' if torch.cuda.is_available() else 'cpu'
+# 'onnx' runs the model on ONNX Runtime, 'torch' on PyTorch (CPU only: a GPU
+# always uses PyTorch)
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'onnx').lower()
+# Larger batches are needed to keep a GPU busy
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', 256 if EMBEDDING_DEVICE == 'cuda' else 64))
+# PyMuPDF is not thread-safe, so large PDFs are split across processes
+PDF_PARSE_WORKERS = int(os.getenv('PDF_PARSE_WORKERS', min(4, os.cpu_count() or 1)))
+PARALLEL_PARSE_MIN_PAGES = 32
+# Segments embedded per pipeline step before being handed to the indexer
+PIPELINE_BATCH_SIZE = 512
+
+def _has_avx512_vnni() -> bool:
+    """Check whether the CPU has the VNNI instructions that int8 kernels rely on"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            return 'avx512_vnni' in f.read()
+    except OSError:
+        return False
+
+def _load_embedding_model() -> SentenceTransformer:
+    """Load the embedding model: FP16 on a GPU, preferring the quantized ONNX export on CPU"""
+    if EMBEDDING_DEVICE == 'cuda':
+        return SentenceTransformer(EMBEDDING_MODEL, device='cuda').half()
+    if EMBEDDING_BACKEND == 'onnx':
+        # The model repository ships ONNX exports. The dynamically quantized
+        # int8 one is only faster with VNNI, without it stay on FP32
+        file_name = 'onnx/model_qint8_avx512_vnni.onnx' if _has_avx512_vnni() else 'onnx/model.onnx'
+        try:
+            import onnxruntime as ort
+            session_options = ort.SessionOptions()
+            session_options.intra_op_num_threads = EMBEDDING_THREADS
+            session_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            return SentenceTransformer(
+                EMBEDDING_MODEL,
+                backend='onnx',
+                model_kwargs={'file_name': file_name, 'session_options': session_options}
+            )
+        except Exception as e:
+            print(f"⚠️ ONNX embedding backend unavailable, falling back to PyTorch: {e}")
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+_model = None
+_model_lock = threading.Lock()
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Return the process pool used for page extraction, starting it on first use"""
+    global _parse_pool
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                # spawn: forking a process that already runs torch threads is unsafe
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=PDF_PARSE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _parse_pool
+
+def get_embedding_model() -> SentenceTransformer:
+    """Return the process-wide embedding model, loading it on first use"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _load_embedding_model()
+    return _model
+
+def warm_up_embedding_model():
+    """Run one encode so runtime sessions and buffers exist before real traffic"""
+    get_embedding_model().encode(["warm up " * 16], show_progress_bar=False)
+
+# Sentence boundary: terminal punctuation followed by whitespace, so decimals
+# like 3.14 and dotted identifiers stay intact
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+# all-MiniLM-L6-v2 truncates at 256 word pieces. Technical text can take two
+# pieces per word, so passages stay at 128 words to keep everything embedded
+CHUNK_MAX_WORDS = 128
+# Words repeated between consecutive windows of an over-long sentence
+CHUNK_OVERLAP_WORDS = 24
+
+def _split_long_sentence(words: List[str], max_words: int, overlap: int) -> List[str]:
+    """Cut a sentence longer than max_words into overlapping windows"""
+    step = max(1, max_words - overlap)
+    windows = []
+    for start in range(0, len(words), step):
+        windows.append(" ".join(words[start:start + max_words]))
+        if start + max_words >= len(words):
+            break
+    return windows
+
+def split_into_chunks(text: str, max_words: int = CHUNK_MAX_WORDS, overlap: int = CHUNK_OVERLAP_WORDS) -> List[str]:
+    """Split text into sentences and pack consecutive ones into passages.
+
+    Sentences longer than max_words (tables, lists, references without
+    terminal punctuation) are cut into overlapping windows of max_words.
+    """
+    chunks = []
+    current = []
+    current_words = 0
+    for sentence in _SENTENCE_RE.split(text):
+        words = sentence.split()
+        if not words:
+            continue
+        if current and current_words + len(words) > max_words:
+            chunks.append(" ".join(current))
+            current = []
+            current_words = 0
+        if len(words) > max_words:
+            chunks.extend(_split_long_sentence(words, max_words, overlap))
+            continue
+        current.append(" ".join(words))
+        current_words += len(words)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def quantize_embeddings(vectors: np.ndarray) -> np.ndarray:
+    """Scale unit-length embeddings (normalize_embeddings=True) to int8 for byte knn_vectors"""
+    # One float32 scratch buffer, rounded and clipped in place
+    scaled = np.multiply(vectors, 127, dtype=np.float32)
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, -128, 127, out=scaled)
+    return scaled.astype(np.int8)
+
+# Mapping for a newly created index. An existing index keeps the mapping it
+# was created with, so changing this requires reindexing into a new index
+INDEX_BODY = {
+    "settings": {
+        "index": {
+            "knn": True
+        }
+    },
+    "mappings": {
+        "properties": {
+            "pdf_id": {"type": "integer"},
+            "filename": {"type": "text"},
+            "text": {"type": "text"},
+            "title": {"type": "text"},
+            "author": {"type": "keyword"},
+            "vector": {
+                "type": "knn_vector",
+                "dimension": 384,  # all-MiniLM-L6-v2 dimension
+                # int8 components: a quarter of the FP32 size
+                "data_type": "byte",
+                "method": {
+                    "name": "hnsw",
+                    "engine": "lucene",
+                    # Vectors are unit length, so the inner product equals
+                    # cosine similarity without normalizing at query time
+                    "space_type": "innerproduct",
+                    "parameters": {
+                        "ef_construction": 128,
+                        "m": 16
+                    }
+                }
+            }
+        }
+    }
+}
+
+@lru_cache(maxsize=1024)
+def _embed_normalized_query(text: str) -> np.ndarray:
+    vector = quantize_embeddings(
+        get_embedding_model().encode(
+            [text], convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+        )
+    )[0]
+    # Cached and shared between callers
+    vector.setflags(write=False)
+    return vector
+
+def embed_query(query: str) -> np.ndarray:
+    """Return the quantized embedding of a search query, cached per query text"""
+    # The model's tokenizer is uncased and splits on whitespace, so case and
+    # spacing variants of a query share one cache entry
+    return _embed_normalized_query(" ".join(query.lower().split()))
+
+def embed_queries(queries: List[str]) -> List[np.ndarray]:
+    """Return the quantized embeddings of several search queries"""
+    if not queries:
+        return []
+    if len(queries) == 1:
+        return [embed_query(queries[0])]
+    # Tokenize and run the whole set through the model in one batch
+    vectors = get_embedding_model().encode(
+        [" ".join(query.lower().split()) for query in queries],
+        batch_size=len(queries),
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False
+    )
+    return list(quantize_embeddings(vectors))
+
+class ORJSONSerializer(JSONSerializer):
+    """Request body serializer that writes NumPy arrays natively via orjson"""
+    
+    def dumps(self, data):
+        # Bulk bodies arrive pre-serialized
+        if isinstance(data, str):
+            return data
+        try:
+            return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            # Types orjson doesn't know (e.g. Decimal) take the stdlib path
+            return super().dumps(data)
 
 class OpenSearchService:
     def __init__(self):
@@ -18,19 +250,20 @@ class OpenSearchService:
             use_ssl=os.getenv('OPENSEARCH_USE_SSL', 'false').lower() == 'true',
             verify_certs=False,
             ssl_show_warn=False,
-            http_compress=True
+            http_compress=True,
+            # Keep-alive pool shared by the indexer thread and request handlers
+            maxsize=32,
+            timeout=60,
+            max_retries=3,
+            retry_on_timeout=True,
+            serializer=ORJSONSerializer()
         )
         self.index_name = os.getenv('OPENSEARCH_INDEX', 'pdf_vectors')
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
+        self.s3_client = get_s3_client()
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'pdf-storage-bucket')
         
         # Initialize sentence transformer model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = get_embedding_model()
         
         # Create index if it doesn't exist
         self._create_index_if_not_exists()
@@ -38,91 +271,108 @@ class OpenSearchService:
     def _create_index_if_not_exists(self):
         """Create the vector index if it doesn't exist"""
         try:
-            if self.client.indices.exists(index=self.index_name):
-                self.client.indices.delete(index=self.index_name)
-            
-            index_body = {
-                "settings": {
-                    "index": {
-                        "knn": True
-                    }
-                },
-                "mappings": {
-                    "properties": {
-                        "pdf_id": {"type": "integer"},
-                        "filename": {"type": "text"},
-                        "text": {"type": "text"},
-                        "title": {"type": "text"},
-                        "author": {"type": "keyword"},
-                        "vector": {
-                            "type": "knn_vector",
-                            "dimension": 384,  # all-MiniLM-L6-v2 dimension
-                            "method": {
-                                "name": "hnsw",
-                                "engine": "lucene",
-                                "space_type": "cosinesimil",
-                                "parameters": {
-                                    "ef_construction": 128,
-                                    "m": 16
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            self.client.indices.create(index=self.index_name, body=index_body)
+            if not self.client.indices.exists(index=self.index_name):
+                self.client.indices.create(index=self.index_name, body=INDEX_BODY)
+            else:
+                self._check_index_mapping()
+        except RequestError as e:
+            # Another worker created it between the check and the create
+            if e.error != 'resource_already_exists_exception':
+                print(f"Error creating index: {e}")
         except Exception as e:
             print(f"Error creating index: {e}")
     
+    def _check_index_mapping(self):
+        """Warn when an existing index was created with an older vector mapping"""
+        mapping = self.client.indices.get_mapping(index=self.index_name)
+        vector = mapping[self.index_name]['mappings']['properties'].get('vector', {})
+        expected = INDEX_BODY['mappings']['properties']['vector']
+        
+        actual_settings = (vector.get('data_type', 'float'), vector.get('method', {}).get('space_type'))
+        expected_settings = (expected['data_type'], expected['method']['space_type'])
+        if actual_settings != expected_settings:
+            # Searches still work, but without the smaller byte vectors and
+            # cheaper scoring of the current mapping
+            print(
+                f"⚠️ Index '{self.index_name}' stores {actual_settings[0]} vectors with "
+                f"{actual_settings[1]} scoring, expected {expected_settings[0]} with "
+                f"{expected_settings[1]}. Reindex into a new index and set OPENSEARCH_INDEX to use it"
+            )
+    
     def download_pdf_from_s3(self, s3_key: str) -> bytes:
         """Download PDF from S3 and return as bytes"""
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            return response['Body'].read()
+            buffer = io.BytesIO()
+            self.s3_client.download_fileobj(
+                self.bucket_name, s3_key, buffer, Config=DOWNLOAD_TRANSFER_CONFIG
+            )
+            return buffer.getvalue()
         except Exception as e:
             raise Exception(f"Error downloading PDF from S3: {str(e)}")
     
     def parse_pdf_content(self, pdf_bytes: bytes) -> List[str]:
-        """Parse PDF content using PyMuPDF parser"""
+        """Parse PDF content page by page using PyMuPDF"""
         try:
-            # Create a temporary file-like object
-            pdf_io = io.BytesIO(pdf_bytes)
-            
-            # Create blob from bytes
-            blob = Blob(data=pdf_bytes, mime_type="application/pdf")
+            page_count = count_pages(pdf_bytes)
             
-            # Parse PDF using PyMuPDF
-            parser = PyMuPDFParser(
-                mode="single",
-                pages_delimiter=""
-            )
-            
-            docs = []
-            docs_lazy = parser.lazy_parse(blob)
-            
-            for doc in docs_lazy:
-                docs.append(doc)
+            if PDF_PARSE_WORKERS > 1 and page_count >= PARALLEL_PARSE_MIN_PAGES:
+                # Extract contiguous page ranges in worker processes
+                step = -(-page_count // PDF_PARSE_WORKERS)
+                starts = list(range(0, page_count, step))
+                stops = [min(start + step, page_count) for start in starts]
+                parts = _get_parse_pool().map(extract_page_texts, [pdf_bytes] * len(starts), starts, stops)
+                page_texts = [text for part in parts for text in part]
+            else:
+                page_texts = extract_page_texts(pdf_bytes, 0, page_count)
             
-            # Extract text and split into sentences
+            # Split each page into passages of whole sentences
             texts = []
-            for doc in docs:
-                for line in doc.page_content.split('.'):
-                    if line.strip():  # Only add non-empty lines
-                        texts.append(line.strip())
+            for page_text in page_texts:
+                texts.extend(split_into_chunks(page_text))
             
             return texts
             
         except Exception as e:
             raise Exception(f"Error parsing PDF content: {str(e)}")
     
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for text content using sentence transformers"""
         try:
-            vectors = self.model.encode(texts, convert_to_numpy=True)
-            return vectors.tolist()
+            # Pass every text in one call: encode() sorts the whole list by
+            # length before batching, which keeps padding per batch minimal
+            vectors = self.model.encode(
+                texts,
+                batch_size=EMBEDDING_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            # Rows stay int8 arrays; the serializer writes them without a list copy
+            return quantize_embeddings(vectors)
         except Exception as e:
             raise Exception(f"Error generating embeddings: {str(e)}")
     
+    def _bulk_index_segments(self, pdf_id: int, filename: str, texts: List[str], vectors: np.ndarray, offset: int):
+        """Index text segments through the bulk API, one request per chunk"""
+        actions = (
+            {
+                "_op_type": "index",
+                "_index": self.index_name,
+                # Use a unique ID for each segment
+                "_id": f"{pdf_id}_{i}",
+                "_source": {
+                    "pdf_id": pdf_id,
+                    "filename": filename,
+                    "text": text,
+                    "vector": vector,
+                    "title": f"{filename}_segment_{i}",
+                    "author": f"pdf_{pdf_id}"
+                }
+            }
+            for i, (text, vector) in enumerate(zip(texts, vectors), start=offset)
+        )
+        helpers.bulk(self.client, actions, chunk_size=500, request_timeout=60, refresh=False)
+    
     def analyze_and_index_pdf(self, pdf_id: int, filename: str, s3_key: str) -> str:
         """Analyze PDF and store in vector database"""
         try:
@@ -132,23 +382,26 @@ class OpenSearchService:
             # Parse PDF content
             texts = self.parse_pdf_content(pdf_bytes)
             
-            # Generate embeddings
-            vectors = self.generate_embeddings(texts)
+            # Headers, footers and boilerplate repeat verbatim across pages;
+            # embed and index each distinct segment once, in reading order
+            texts = list(dict.fromkeys(texts))
             
-            # Index each text segment with its vector
-            for i, (text, vector) in enumerate(zip(texts, vectors)):
-                doc = {
-                    "pdf_id": pdf_id,
-                    "filename": filename,
-                    "text": text,
-                    "vector": vector,
-                    "title": f"{filename}_segment_{i}",
-                    "author": f"pdf_{pdf_id}"
-                }
-                
-                # Use a unique ID for each segment
-                segment_id = f"{pdf_id}_{i}"
-                self.client.index(index=self.index_name, id=segment_id, body=doc)
+            # Embed and index in batches: while one batch is being sent to
+            # OpenSearch (network bound) the next one is encoded (CPU bound)
+            with ThreadPoolExecutor(max_workers=1) as indexer:
+                pending = None
+                for start in range(0, len(texts), PIPELINE_BATCH_SIZE):
+                    batch = texts[start:start + PIPELINE_BATCH_SIZE]
+                    vectors = self.generate_embeddings(batch)
+                    if pending is not None:
+                        # Surfaces indexing errors and keeps one batch in flight
+                        pending.result()
+                    pending = indexer.submit(self._bulk_index_segments, pdf_id, filename, batch, vectors, start)
+                if pending is not None:
+                    pending.result()
+            
+            # Make the new segments searchable with a single refresh
+            self.client.indices.refresh(index=self.index_name)
             
             # Return a reference ID for the PDF
             vector_index_id = f"pdf_{pdf_id}"
@@ -160,8 +413,8 @@ class OpenSearchService:
     def delete_pdf_from_index(self, vector_index_id: str) -> bool:
         """Delete PDF from vector index"""
         try:
-            # Delete all segments for this PDF
-            search_body = {
+            # Delete all segments for this PDF server-side in one request
+            delete_body = {
                 "query": {
                     "term": {
                         "pdf_id": int(vector_index_id.replace("pdf_", ""))
@@ -169,9 +422,13 @@ class OpenSearchService:
                 }
             }
             
-            response = self.client.search(index=self.index_name, body=search_body)
-            for hit in response['hits']['hits']:
-                self.client.delete(index=self.index_name, id=hit['_id'])
+            self.client.delete_by_query(
+                index=self.index_name,
+                body=delete_body,
+                refresh=True,
+                conflicts="proceed",
+                wait_for_completion=True
+            )
             
             return True
         except NotFoundError:
@@ -179,11 +436,15 @@ class OpenSearchService:
         except Exception as e:
             raise Exception(f"Error deleting from vector index: {str(e)}")
     
+    async def delete_pdf_from_index_async(self, vector_index_id: str) -> bool:
+        """Delete PDF from vector index without blocking the event loop"""
+        return await asyncio.to_thread(self.delete_pdf_from_index, vector_index_id)
+    
     def search_similar_pdfs(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Search for similar PDFs based on content"""
         try:
             # Generate embeddings for query
-            query_embeddings = self.model.encode([query], convert_to_numpy=True)[0].tolist()
+            query_embeddings = embed_query(query)
             
             # Search in vector index
             search_body = {
@@ -217,36 +478,53 @@ class OpenSearchService:
     
     def search_similar_content(self, query: str, max_results: int = 3) -> List[Dict[str, Any]]:
         """Search for similar content and return text with sources for RAG"""
+        return self.search_similar_contents([query], max_results=max_results)[0]
+    
+    def search_similar_contents(self, queries: List[str], max_results: int = 3) -> List[List[Dict[str, Any]]]:
+        """Search for similar content for several queries at once, one result list per query"""
+        if not queries:
+            return []
         try:
-            # Generate embeddings for query
-            query_embeddings = self.model.encode([query], convert_to_numpy=True)[0].tolist()
+            # Generate embeddings for all queries in one forward pass
+            query_embeddings = embed_queries(queries)
             
-            # Search in vector index
-            search_body = {
-                'query': {
-                    'knn': {
-                        'vector': {
-                            'vector': query_embeddings,
-                            'k': max_results
+            # One header/body pair per query, sent in a single request
+            search_bodies = []
+            for query_embedding in query_embeddings:
+                search_bodies.append({'index': self.index_name})
+                search_bodies.append({
+                    'query': {
+                        'knn': {
+                            'vector': {
+                                'vector': query_embedding,
+                                'k': max_results
+                            }
                         }
-                    }
-                },
-                '_source': ['pdf_id', 'filename', 'text', 'title', 'author']
-            }
+                    },
+                    '_source': ['pdf_id', 'filename', 'text', 'title', 'author']
+                })
             
-            response = self.client.search(index=self.index_name, body=search_body)
+            response = self.client.msearch(body=search_bodies)
             
-            results = []
-            for hit in response['hits']['hits']:
-                results.append({
-                    'content': hit['_source']['text'],
-                    'filename': hit['_source']['filename'],
-                    'pdf_id': hit['_source']['pdf_id'],
-                    'score': hit['_score']
-                })
+            all_results = []
+            for query_response in response['responses']:
+                if 'error' in query_response:
+                    print(f"Error searching similar content: {query_response['error']}")
+                    all_results.append([])
+                    continue
+                
+                results = []
+                for hit in query_response['hits']['hits']:
+                    results.append({
+                        'content': hit['_source']['text'],
+                        'filename': hit['_source']['filename'],
+                        'pdf_id': hit['_source']['pdf_id'],
+                        'score': hit['_score']
+                    })
+                all_results.append(results)
             
-            return results
+            return all_results
             
         except Exception as e:
             print(f"Error searching similar content: {str(e)}")
-            return [] 
\ No newline at end of file
+            return [[] for _ in queries]
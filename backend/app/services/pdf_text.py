@@ -0,0 +1,14 @@
+import fitz
+from typing import List
+
+# Kept free of heavy imports: this module is loaded by the PDF parsing worker
+# processes, which only need PyMuPDF
+
+def extract_page_texts(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Extract the plain text of pages [start, stop) of a PDF"""
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return [doc.load_page(i).get_text("text") for i in range(start, stop)]
+
+def count_pages(pdf_bytes: bytes) -> int:
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return doc.page_count
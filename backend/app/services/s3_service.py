@@ -1,18 +1,61 @@
+import asyncio
 import boto3
 import os
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import time
 import uuid
 
+# Large objects are fetched as parallel ranged GETs
+DOWNLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8
+)
+
+PRESIGNED_URL_EXPIRES = 3600  # URL expires in 1 hour
+# A signed URL is handed out again for this long, so every URL returned still
+# has at least 45 minutes of validity left
+PRESIGNED_URL_REUSE = 900
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+MULTIPART_MAX_PARTS = 10_000
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """Return the process-wide S3 client (clients are thread-safe and expensive to build)"""
+    return boto3.client(
+        's3',
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        region_name=os.getenv('AWS_REGION', 'us-east-1'),
+        config=Config(
+            max_pool_connections=32,
+            tcp_keepalive=True,
+            retries={'mode': 'adaptive'}
+        )
+    )
+
 class S3Service:
     def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
+        self.s3_client = get_s3_client()
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'pdf-storage-bucket')
+        # SigV4 signing is pure CPU work; reuse URLs within a reuse window
+        self._presign_put = lru_cache(maxsize=1024)(self._sign_put_url)
+    
+    def _sign_put_url(self, s3_key: str, window: int) -> str:
+        """Sign a PUT URL; window only partitions the cache"""
+        return self.s3_client.generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': self.bucket_name,
+                'Key': s3_key,
+                'ContentType': 'application/pdf'
+            },
+            ExpiresIn=PRESIGNED_URL_EXPIRES
+        )
     
     def generate_presigned_url(self, s3_key: str, filename: str) -> str:
         """Generate a pre-signed URL for uploading a PDF file"""
@@ -21,21 +64,73 @@ class S3Service:
             s3_key = f"pdfs/{filename}"
             
             # Generate pre-signed URL for PUT operation
-            presigned_url = self.s3_client.generate_presigned_url(
-                'put_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': s3_key,
-                    'ContentType': 'application/pdf'
-                },
-                ExpiresIn=3600  # URL expires in 1 hour
-            )
+            presigned_url = self._presign_put(s3_key, int(time.time() // PRESIGNED_URL_REUSE))
             
             return presigned_url, s3_key
             
         except ClientError as e:
             raise Exception(f"Error generating presigned URL: {str(e)}")
     
+    def create_multipart_upload(self, s3_key: str, file_size: int) -> Tuple[str, int, List[str]]:
+        """Start a multipart upload and pre-sign a PUT URL for each part.
+
+        Returns the upload id, the part size and the part URLs in part order.
+        """
+        try:
+            part_size = max(MULTIPART_PART_SIZE, -(-file_size // MULTIPART_MAX_PARTS))
+            part_count = max(1, -(-file_size // part_size))
+            
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                ContentType='application/pdf'
+            )
+            upload_id = response['UploadId']
+            
+            part_urls = [
+                self.s3_client.generate_presigned_url(
+                    'upload_part',
+                    Params={
+                        'Bucket': self.bucket_name,
+                        'Key': s3_key,
+                        'UploadId': upload_id,
+                        'PartNumber': part_number
+                    },
+                    ExpiresIn=PRESIGNED_URL_EXPIRES
+                )
+                for part_number in range(1, part_count + 1)
+            ]
+            
+            return upload_id, part_size, part_urls
+            
+        except ClientError as e:
+            raise Exception(f"Error starting multipart upload: {str(e)}")
+    
+    def complete_multipart_upload(self, s3_key: str, upload_id: str, parts: List[Dict]) -> bool:
+        """Assemble uploaded parts; parts are dicts with PartNumber and ETag"""
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': sorted(parts, key=lambda part: part['PartNumber'])}
+            )
+            return True
+        except ClientError as e:
+            raise Exception(f"Error completing multipart upload: {str(e)}")
+    
+    def abort_multipart_upload(self, s3_key: str, upload_id: str) -> bool:
+        """Abort a multipart upload and free the parts uploaded so far"""
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id
+            )
+            return True
+        except ClientError as e:
+            raise Exception(f"Error aborting multipart upload: {str(e)}")
+    
     def delete_file(self, s3_key: str) -> bool:
         """Delete a file from S3"""
         try:
@@ -47,6 +142,10 @@ class S3Service:
         except ClientError as e:
             raise Exception(f"Error deleting file from S3: {str(e)}")
     
+    async def delete_file_async(self, s3_key: str) -> bool:
+        """Delete a file from S3 without blocking the event loop"""
+        return await asyncio.to_thread(self.delete_file, s3_key)
+    
     def get_file_size(self, s3_key: str) -> Optional[int]:
         """Get file size from S3"""
         try:
@@ -56,4 +155,8 @@ class S3Service:
             )
             return response.get('ContentLength')
         except ClientError:
-            return None 
\ No newline at end of file
+            return None
+    
+    async def get_file_size_async(self, s3_key: str) -> Optional[int]:
+        """Get file size from S3 without blocking the event loop"""
+        return await asyncio.to_thread(self.get_file_size, s3_key)
@@ -1,23 +1,30 @@
 #!/usr/bin/env python3
 
+import asyncio
+from sqlalchemy import text
 from app.database import engine
 from app.models import Base
 
-print("Testing database connection...")
+async def main():
+    print("Testing database connection...")
 
-try:
-    # Test connection
-    with engine.connect() as conn:
-        from sqlalchemy import text
-        result = conn.execute(text("SELECT 1"))
-        print("✅ Database connection successful!")
-    
-    # Create tables
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created successfully!")
-    
-except Exception as e:
-    print(f"❌ Database connection failed: {e}")
-    import traceback
-    traceback.print_exc() 
\ No newline at end of file
+    try:
+        # Test connection
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT 1"))
+            print("✅ Database connection successful!")
+
+        # Create tables
+        print("Creating database tables...")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        print("✅ Database tables created successfully!")
+
+    except Exception as e:
+        print(f"❌ Database connection failed: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        await engine.dispose()
+
+asyncio.run(main())